@@ -1,39 +1,26 @@
+import altair as alt
 import numpy as np
-import matplotlib.pyplot as plt
 import pandas as pd
 import streamlit as st
-import matplotlib.dates as mdates
-from matplotlib.ticker import FuncFormatter
 
+from simulation_core import simulate_core
+
+@st.cache_data(show_spinner=False)
 def simulate_assets(start_year, start_age, initial_assets, annual_return, monthly_investment, end_investment_year, start_withdrawal_year, withdrawal_rate):
-    end_year = start_year + (100 - start_age)
-    years = list(range(start_year, end_year + 1))
-    ages = list(range(start_age, 101))
-    
-    assets = [initial_assets]
-    monthly_withdrawals = [0]
-    
-    for year in years[1:]:
-        prev_asset = assets[-1]
-        current_asset = prev_asset
-        
-        for month in range(12):
-            if year <= end_investment_year:
-                current_asset += monthly_investment
-            monthly_return = (1 + annual_return) ** (1/12) - 1
-            current_asset *= (1 + monthly_return)
-            if year >= start_withdrawal_year:
-                monthly_withdrawal = prev_asset * withdrawal_rate / 12
-                current_asset -= monthly_withdrawal
-            else:
-                monthly_withdrawal = 0
-        
-        assets.append(max(0, current_asset))
-        if year >= start_withdrawal_year:
-            monthly_withdrawals.append(prev_asset * withdrawal_rate / 12)
-        else:
-            monthly_withdrawals.append(0)
-            
+    n_years = 100 - start_age
+    years = np.arange(start_year, start_year + n_years + 1, dtype=np.int32)
+    ages = np.arange(start_age, 101, dtype=np.int32)
+
+    assets, monthly_withdrawals = simulate_core(
+        n_years,
+        float(initial_assets),
+        float(annual_return),
+        float(monthly_investment),
+        end_investment_year - start_year,
+        start_withdrawal_year - start_year,
+        float(withdrawal_rate)
+    )
+
     results = pd.DataFrame({
         '西暦': years,
         '年齢': ages,
@@ -43,38 +30,56 @@ def simulate_assets(start_year, start_age, initial_assets, annual_return, monthl
     return results
 
 def plot_simulation(results):
-    fig, ax1 = plt.subplots(figsize=(12, 8))
-    
-    ax1.set_xlabel('Age', fontsize=12)
-    ax1.set_ylabel('Total Assets (10,000 JPY)', fontsize=12)
-    ax1.plot(results['年齢'], results['投資資産額'] / 10000, 'b-', linewidth=2)
-    ax1.tick_params(axis='y', labelcolor='blue')
-    
-    def millions_formatter(x, pos):
-        return f'{x:.0f}'
-    ax1.yaxis.set_major_formatter(FuncFormatter(millions_formatter))
-    
-    ax1.grid(True, linestyle='--', alpha=0.7)
-    
-    ax2 = ax1.twinx()
-    ax2.set_ylabel('Monthly Withdrawal (10,000 JPY)', fontsize=12, color='red')
-    ax2.plot(results['年齢'], results['毎月の取り崩し金額'] / 10000, 'r-', linewidth=2)
-    ax2.tick_params(axis='y', labelcolor='red')
-    ax2.yaxis.set_major_formatter(FuncFormatter(millions_formatter))
+    # グラフ用の値は万円単位なので float32 で十分（ブラウザへ送るデータ量が半分になる）
+    chart_data = pd.DataFrame({
+        'Age': results['年齢'],
+        'Total Assets': (results['投資資産額'] / 10000).astype(np.float32),
+        'Monthly Withdrawal': (results['毎月の取り崩し金額'] / 10000).astype(np.float32)
+    })
+    base = alt.Chart(chart_data).encode(x=alt.X('Age:Q', title='Age'))
+    # 凡例用に系列名を色へ対応付ける（色のスケールは両レイヤーで共有される）
+    color = alt.Color('series:N', title=None,
+                      scale=alt.Scale(domain=['Total Assets', 'Monthly Withdrawal'], range=['blue', 'red']),
+                      legend=alt.Legend(orient='top-left'))
     
-    plt.title('Asset Balance and Monthly Withdrawal by Age', fontsize=16)
-    ax1.legend(['Total Assets'], loc='upper left')
-    ax2.legend(['Monthly Withdrawal'], loc='upper right')
-    plt.tight_layout()
+    assets_line = base.mark_line(strokeWidth=2).transform_calculate(series="'Total Assets'").encode(
+        y=alt.Y('Total Assets:Q', title='Total Assets (10,000 JPY)',
+                axis=alt.Axis(format='.0f', titleColor='blue', labelColor='blue')),
+        color=color
+    )
+    withdrawal_line = base.mark_line(strokeWidth=2).transform_calculate(series="'Monthly Withdrawal'").encode(
+        y=alt.Y('Monthly Withdrawal:Q', title='Monthly Withdrawal (10,000 JPY)',
+                axis=alt.Axis(format='.0f', titleColor='red', labelColor='red', grid=False)),
+        color=color
+    )
     
-    return fig
+    # 左右の軸で別々のスケールを使う（matplotlib の twinx 相当）
+    return alt.layer(assets_line, withdrawal_line).resolve_scale(y='independent').properties(
+        title='Asset Balance and Monthly Withdrawal by Age',
+        height=500
+    )
 
-def format_currency(value):
-    return f"{value:,.0f}"
+@st.cache_data(show_spinner=False)
+def _csv_bytes(results):
+    return results.to_csv(index=False).encode('utf-8-sig')
 
 # --- Streamlit アプリケーション ---
 st.title('「じぶん年金」シミュレーション')
 
+st.markdown(
+    """
+    <style>
+    div[data-testid="stDataEditor"] thead th {
+        text-align: center;
+    }
+    div[data-testid="stDataEditor"] tbody td {
+        text-align: right;
+    }
+    </style>
+    """,
+    unsafe_allow_html=True
+)
+
 # サイドバー入力
 with st.sidebar:
     st.header('入力パラメータ')
@@ -100,35 +105,15 @@ if st.sidebar.button('シミュレーション実行'):
         withdrawal_rate
     )
 
-    st.markdown(
-        """
-        <style>
-        div[data-testid="stDataEditor"] thead th {
-            text-align: center;
-        }
-        div[data-testid="stDataEditor"] tbody td {
-            text-align: right;
-        }
-        </style>
-        """,
-        unsafe_allow_html=True
-    )
-    
     st.header('「投資資産」と「取り崩し金額」の推移')
-    fig = plot_simulation(results)
-    st.pyplot(fig)
+    chart = plot_simulation(results)
+    st.altair_chart(chart, width='stretch')
 
     st.header('シミュレーション結果')
 
-    # 金額整形
-    display_results = results.copy()
-    #display_results['投資資産額'] = display_results['投資資産額'].apply(format_currency)
-    #display_results['毎月の取り崩し金額'] = display_results['毎月の取り崩し金額'].apply(format_currency)
-
-
-    # --- テーブル表示 ---
+    # --- テーブル表示（金額の整形は NumberColumn の format で行う） ---
     st.data_editor(
-        display_results,
+        results,
         hide_index=True,
         column_config={
             "投資資産額": st.column_config.NumberColumn("投資資産額", format="%d", width="medium", disabled=True),
@@ -139,7 +124,7 @@ if st.sidebar.button('シミュレーション実行'):
     )
 
     # --- CSVダウンロード ---
-    csv = results.to_csv(index=False).encode('utf-8-sig')
+    csv = _csv_bytes(results)
     st.download_button(
         label="CSVファイルをダウンロード",
         data=csv,
@@ -0,0 +1,72 @@
+import numba
+import numpy as np
+
+# Streamlit はボタン操作のたびにメインスクリプトを再実行するため、
+# JIT 対象の関数は別モジュールに置き、プロセス内で一度だけコンパイルされるようにする。
+# シグネチャを明示しているので import 時にコンパイルされ、結果は __pycache__ にキャッシュされる。
+
+@numba.njit(cache=True)
+def _annuity_factor(one_plus):
+    # 12ヶ月分の積立を年末価値に換算する係数 A = Σ g^k (k=0..11)。
+    # 和をそのまま計算するので月利 0 の特別扱いは不要。スカラーでも配列でも使える。
+    factor = one_plus
+    for _ in range(10):
+        factor = (factor + 1.0) * one_plus
+    return factor + 1.0
+
+@numba.njit(
+    'Tuple((float64[:], float64[:]))(int64, float64, float64, float64, int64, int64, float64)',
+    cache=True,
+    fastmath=True,
+)
+def simulate_core(n_years, initial_assets, annual_return, monthly_investment, end_invest_offset, start_withdraw_offset, withdrawal_rate):
+    # 月利 g と、12ヶ月分の積立を年末価値に換算する係数 A
+    monthly_return = (1.0 + annual_return) ** (1.0 / 12.0) - 1.0
+    one_plus = 1.0 + monthly_return
+    G = one_plus ** 12
+    A = _annuity_factor(one_plus)
+    # 年をまたいで変わらない項はループの外で計算しておく
+    contrib_fv = monthly_investment * one_plus * A
+    monthly_withdrawal_rate = withdrawal_rate / 12.0
+
+    assets = np.empty(n_years + 1)
+    monthly_withdrawals = np.empty(n_years + 1)
+    assets[0] = initial_assets
+    monthly_withdrawals[0] = 0.0
+
+    for i in range(1, n_years + 1):
+        prev_asset = assets[i - 1]
+        # 積立・取り崩しの有無は 0/1 のフラグを掛けて分岐なしで反映する
+        contrib = contrib_fv * (i <= end_invest_offset)
+        monthly_withdrawal = prev_asset * monthly_withdrawal_rate * (i >= start_withdraw_offset)
+        # 月初に積立、月末に運用益を反映してから取り崩す処理を1年分まとめて計算
+        current_asset = prev_asset * G + contrib - monthly_withdrawal * A
+        assets[i] = max(0.0, current_asset)
+        monthly_withdrawals[i] = monthly_withdrawal
+
+    return assets, monthly_withdrawals
+
+def simulate_scenarios(n_years, initial_assets, annual_returns, monthly_investment, end_invest_offset, start_withdraw_offset, withdrawal_rate):
+    # annual_returns に (S,) の配列を渡すと、S 通りのシナリオを一度に計算する。
+    # 戻り値は (n_years + 1, S) の配列で、np.percentile(assets, [10, 50, 90], axis=1) などで集計できる。
+    annual_returns = np.asarray(annual_returns, dtype=np.float64)
+    monthly_return = (1.0 + annual_returns) ** (1.0 / 12.0) - 1.0
+    one_plus = 1.0 + monthly_return
+    G = one_plus ** 12
+    A = _annuity_factor(one_plus)
+    contrib_fv = monthly_investment * one_plus * A
+    monthly_withdrawal_rate = withdrawal_rate / 12.0
+
+    assets = np.empty((n_years + 1,) + annual_returns.shape)
+    monthly_withdrawals = np.empty((n_years + 1,) + annual_returns.shape)
+    assets[0] = initial_assets
+    monthly_withdrawals[0] = 0.0
+
+    for i in range(1, n_years + 1):
+        prev_asset = assets[i - 1]
+        contrib = contrib_fv * (i <= end_invest_offset)
+        monthly_withdrawal = prev_asset * monthly_withdrawal_rate * (i >= start_withdraw_offset)
+        assets[i] = np.maximum(0.0, prev_asset * G + contrib - monthly_withdrawal * A)
+        monthly_withdrawals[i] = monthly_withdrawal
+
+    return assets, monthly_withdrawals